@@ -1,15 +1,66 @@
 import os
+import logging
+import time
+import random
+import threading
 import uuid
+import hashlib
 import boto3
-import json
-from pinecone import Pinecone, ServerlessSpec
+import orjson
+import numpy as np
+from queue import Queue
+from itertools import islice
+from typing import Iterator
+from cachetools import LRUCache
+from pinecone.grpc import PineconeGRPC
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Constants
 EMBEDDING_MODEL = 'models/text-embedding-004'
+# Maximum number of texts accepted by a single embedding request
+EMBEDDING_BATCH_SIZE = 100
+# Maximum number of embedding requests processed concurrently
+EMBED_CONCURRENCY = int(os.environ.get("EMBED_CONCURRENCY", 8))
+# Maximum number of attempts made for a single embedding request
+EMBED_MAX_ATTEMPTS = 5
+# Errors of the embedding model that are temporary (e.g., rate limiting), and therefore retried
+EMBED_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+# Number of chunks embedded before their records are handed over for upsert (one full round of concurrent batches)
+EMBEDDING_CHUNK_SIZE = EMBEDDING_BATCH_SIZE * EMBED_CONCURRENCY
+# Maximum number of embeddings kept in the in-memory embedding cache
+EMBEDDING_CACHE_SIZE = 4096
+# Number of seconds after which embeddings expire in the persistent embedding cache (30 days)
+EMBEDDING_CACHE_TTL = 30 * 24 * 60 * 60
+# Maximum number of keys accepted by a single DynamoDB BatchGetItem request
+DYNAMODB_BATCH_GET_SIZE = 100
+# Number of threads used by the Pinecone client for asynchronous requests
+PINECONE_POOL_THREADS = int(os.environ.get("PINECONE_POOL_THREADS", 30))
+# Maximum number of vectors sent in a single upsert request
+UPSERT_BATCH_SIZE = 100
+# Maximum number of upsert batches waiting to be sent to the vector store
+UPSERT_QUEUE_SIZE = 4
+# Maximum number of IDs sent in a single delete request
+DELETE_BATCH_SIZE = 1000
+
+# Logger (Lambda attaches its handler to the root logger)
+logger = logging.getLogger()
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 
 # Singleton instances
 vector_store_idx = None
+embedding_cache_table = None
+lambda_client = None
+# In-memory embedding cache (reused across warm Lambda invocations)
+embedding_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+# Shared thread pool (reused across warm Lambda invocations)
+executor = ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY)
 
 def get_vector_store_index():
     """
@@ -22,85 +73,332 @@ def get_vector_store_index():
     global vector_store_idx
     # Initialize the Pinecone index if not initialized
     if vector_store_idx is None:
-        print("Initializing Pinecone index")
+        logger.debug("Initializing Pinecone index")
         # Validate Pinecone API key
         if "PINECONE_API_KEY" not in os.environ:
             raise Exception("PINECONE_API_KEY environment variable is required")
-        # Initialize Pinecone client
-        pc = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
-        print("Pinecone client initialized")
+        # Initialize Pinecone client (using gRPC transport)
+        pc = PineconeGRPC(api_key=os.environ["PINECONE_API_KEY"])
+        logger.debug("Pinecone client initialized")
         # Instantiate and return Pinecone index
-        vector_store_idx = pc.Index(host=os.environ["PINECONE_INDEX_HOST"])
-        print("Pinecone index initialized")
+        vector_store_idx = pc.Index(host=os.environ["PINECONE_INDEX_HOST"], pool_threads=PINECONE_POOL_THREADS)
+        logger.debug("Pinecone index initialized")
     return vector_store_idx
 
-def delete_existing_chunks(url: str):
+def get_embedding_cache_table():
+    """
+    This method returns the Singleton DynamoDB table instance used as the persistent embedding cache.
+    If the `EMBED_CACHE_TABLE` environment variable is not set, the persistent embedding cache is disabled.
+
+    :return: The DynamoDB table, or None if the persistent embedding cache is disabled
+    :rtype: Table
+    """
+    global embedding_cache_table
+    # Initialize the DynamoDB table if not initialized
+    if embedding_cache_table is None and "EMBED_CACHE_TABLE" in os.environ:
+        logger.debug("Initializing embedding cache table")
+        embedding_cache_table = boto3.resource('dynamodb').Table(os.environ["EMBED_CACHE_TABLE"])
+        logger.debug("Embedding cache table initialized")
+    return embedding_cache_table
+
+def get_lambda_client():
+    """
+    This method returns the Singleton AWS Lambda client instance.
+    If the instance is not initialized, it initializes the AWS Lambda client.
+
+    :return: The AWS Lambda client
+    :rtype: Lambda.Client
+    """
+    global lambda_client
+    # Initialize the AWS Lambda client if not initialized
+    if lambda_client is None:
+        lambda_client = boto3.client('lambda')
+    return lambda_client
+
+def configure_embedding_model():
+    """
+    This method configures the Google Generative AI client used to generate embeddings.
+    The gRPC transport is used, so all (concurrent) embedding requests share a single HTTP/2 connection.
+    """
+    logger.debug("Configuring embedding model client")
+    # Validate Google API key
+    if "GOOGLE_API_KEY" not in os.environ:
+        raise Exception("GOOGLE_API_KEY environment variable is required")
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"], transport="grpc")
+    logger.debug("Embedding model client configured")
+
+# Initialize the clients at import, so the initialization is done during the Lambda init phase
+# rather than on the first invocation (errors are logged so the import still succeeds, e.g., in local testing)
+# Each client is initialized separately, so a single failure doesn't skip the initialization of the others
+for initialize_client in (configure_embedding_model, get_vector_store_index, get_embedding_cache_table, get_lambda_client):
+    try:
+        initialize_client()
+    except Exception as e:
+        logger.warning("An error occurred while initializing clients (%s): %s", initialize_client.__name__, e)
+
+def get_existing_chunk_ids(url: str) -> set[str]:
+    """
+    This method lists the IDs of the existing chunks in the vector store belonging to the URL.
+
+    Errors are raised, as stale chunks could not be identified (and deleted) without the full list of IDs.
+
+    :param str url: The URL of the page
+    :return: The IDs of the existing chunks
+    :rtype: set
     """
-    This method deletes the existing chunks in the vector store belonging to the URL.
-    URL is stored in the metadata of each document chunk on the vector store.
+    logger.debug("Listing existing chunks for %s", url)
+    # Get Singleton vector store index instance
+    vector_store_idx = get_vector_store_index()
+    existing_ids = set()
+    try:
+        # List chunk IDs in the namespace of the URL (one page of IDs at a time)
+        for ids in vector_store_idx.list(namespace=url):
+            existing_ids.update(ids)
+    except Exception as e:
+        raise Exception(f"An error occurred while listing existing chunks: {e}")
+    logger.debug("%d existing chunks found for %s", len(existing_ids), url)
+    return existing_ids
+
+def delete_existing_chunks(url: str, ids: set[str]):
+    """
+    This method deletes the given existing chunks in the vector store belonging to the URL.
+    IDs are deleted in batches of `DELETE_BATCH_SIZE`, and the batches are sent concurrently.
 
     :param str url: The URL of the page
+    :param set[str] ids: The IDs of the chunks to delete
     """
-    print(f"Deleting existing chunks for {url}")
+    logger.debug("Deleting %d existing chunks for %s", len(ids), url)
     # Get Singleton vector store index instance
     vector_store_idx = get_vector_store_index()
     # Delete existing chunks in vector store belonging to the URL
     try:
+        ids = list(ids)
         # Delete chunks in the namespace of the URL
-        vector_store_idx.delete(delete_all=True, namespace=url)
+        futures = [
+            vector_store_idx.delete(ids=ids[i:i + DELETE_BATCH_SIZE], namespace=url, async_req=True)
+            for i in range(0, len(ids), DELETE_BATCH_SIZE)
+        ]
+        # Wait for all batches to be deleted
+        for future in futures:
+            future.result()
     except Exception as e:
-        print(f"An error occurred while deleting existing chunks: {e}")
-    print(f"Existing chunks deleted for {url}")
+        logger.error("An error occurred while deleting existing chunks: %s", e)
+    logger.info("Existing chunks deleted for %s", url)
 
-def get_embeddings(text: str) -> list[float]:
+def get_chunk_id(chunk: str) -> str:
+    """
+    This method returns the deterministic ID of the given document chunk.
+    The ID is a UUID (version 5) derived from the SHA-256 hash of the chunk content.
+
+    :param str chunk: The document chunk
+    :return: The chunk ID
+    :rtype: str
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, hashlib.sha256(chunk.encode('utf-8')).hexdigest()))
+
+def get_embeddings(text: str) -> np.ndarray:
     """
     This method generates embeddings for the given text using the default embedding model.
 
     :param str text: The text to generate embeddings for
-    :return: The embeddings
+    :return: The embeddings (as a float32 array)
+    :rtype: np.ndarray
+    """
+    return get_embeddings_batch([text])[0]
+
+def embed_batch(texts: list[str]) -> list[np.ndarray]:
+    """
+    This method generates embeddings for a single batch of texts using the default embedding model.
+    Requests failing with a temporary error (e.g., rate limited requests) are retried with exponential backoff
+    and jitter, other errors are raised immediately.
+
+    :param list[str] texts: The texts to generate embeddings for
+    :return: The embeddings as float32 arrays (in the same order as the given texts)
     :rtype: list
     """
-    # Generate embeddings for the given text
-    embedding = genai.embed_content(model=EMBEDDING_MODEL,
-                                    content=text,
-                                    task_type="retrieval_document")['embedding']
-    return embedding
+    for attempt in range(EMBED_MAX_ATTEMPTS):
+        try:
+            embeddings = genai.embed_content(model=EMBEDDING_MODEL,
+                                             content=texts,
+                                             task_type="retrieval_document")['embedding']
+            # Vectors are stored as float32 in the vector store, so no precision is lost
+            # Each embedding gets its own array, so a cached embedding doesn't keep its whole batch in memory
+            return [np.asarray(embedding, dtype=np.float32) for embedding in embeddings]
+        except EMBED_RETRYABLE_ERRORS as e:
+            # Raise the error if no attempts are left
+            if attempt == EMBED_MAX_ATTEMPTS - 1:
+                raise
+            logger.warning("An error occurred while generating embeddings (attempt %d): %s", attempt + 1, e)
+            # Jitter keeps concurrent batches from retrying at the same moment
+            time.sleep(2 ** attempt * random.uniform(0.5, 1.5))
 
-def prepare_data_for_upsert(url: str, data_chunks: list[str]) -> list:
+def get_embedding_cache_key(text: str) -> str:
+    """
+    This method returns the key used to cache the embeddings of the given text.
+    The key is the SHA-256 hash of the embedding model name and the text.
+
+    :param str text: The text
+    :return: The cache key
+    :rtype: str
+    """
+    return hashlib.sha256((EMBEDDING_MODEL + text).encode('utf-8')).hexdigest()
+
+def get_cached_embeddings(cache_keys: list[str]) -> dict[str, np.ndarray]:
+    """
+    This method retrieves the embeddings stored in the persistent embedding cache for the given cache keys.
+    Errors are logged but not raised, as the cache is only an optimization.
+
+    :param list[str] cache_keys: The cache keys
+    :return: The embeddings found in the cache, keyed by cache key
+    :rtype: dict
+    """
+    cached_embeddings = {}
+    table = get_embedding_cache_table()
+    if table is None or not cache_keys:
+        return cached_embeddings
+    try:
+        for i in range(0, len(cache_keys), DYNAMODB_BATCH_GET_SIZE):
+            request_items = {
+                table.name: {
+                    'Keys': [{'cache_key': key} for key in cache_keys[i:i + DYNAMODB_BATCH_GET_SIZE]],
+                    'ProjectionExpression': 'cache_key, embedding'
+                }
+            }
+            # Keep requesting until DynamoDB has processed all keys
+            # (the client of the table resource converts keys and items to and from plain Python values)
+            while request_items:
+                response = table.meta.client.batch_get_item(RequestItems=request_items)
+                for item in response['Responses'].get(table.name, []):
+                    cached_embeddings[item['cache_key']] = np.frombuffer(item['embedding'].value, dtype=np.float32)
+                request_items = response.get('UnprocessedKeys')
+    except Exception as e:
+        logger.warning("An error occurred while reading the embedding cache: %s", e)
+    return cached_embeddings
+
+def cache_embeddings(embeddings: dict[str, np.ndarray]):
+    """
+    This method stores the given embeddings in the persistent embedding cache.
+    Embeddings are stored as float32 bytes and expire after `EMBEDDING_CACHE_TTL` seconds.
+    Errors are logged but not raised, as the cache is only an optimization.
+
+    :param dict[str, np.ndarray] embeddings: The embeddings, keyed by cache key
+    """
+    table = get_embedding_cache_table()
+    if table is None or not embeddings:
+        return
+    expires_at = int(time.time()) + EMBEDDING_CACHE_TTL
+    try:
+        # Batch writer splits the items into BatchWriteItem requests and retries unprocessed items
+        with table.batch_writer() as batch:
+            for key, embedding in embeddings.items():
+                batch.put_item(Item={
+                    'cache_key': key,
+                    'embedding': embedding.tobytes(),
+                    'expires_at': expires_at
+                })
+    except Exception as e:
+        logger.warning("An error occurred while writing the embedding cache: %s", e)
+
+def get_embeddings_batch(texts: list[str]) -> list[np.ndarray]:
+    """
+    This method generates embeddings for the given texts using the default embedding model.
+    Duplicate texts are embedded only once, and embeddings are looked up in the in-memory and persistent
+    embedding caches before being generated. Remaining texts are split into batches of `EMBEDDING_BATCH_SIZE`,
+    and the batches are sent concurrently to the embedding model.
+
+    :param list[str] texts: The texts to generate embeddings for
+    :return: The embeddings as float32 arrays (in the same order as the given texts)
+    :rtype: list
+    """
+    # Map each unique text to the positions it occupies in the given texts
+    positions = {}
+    for i, text in enumerate(texts):
+        positions.setdefault(text, []).append(i)
+    if len(positions) < len(texts):
+        logger.debug("Skipping embedding generation for %d duplicate texts", len(texts) - len(positions))
+    cache_keys = {text: get_embedding_cache_key(text) for text in positions}
+    # Look up the embeddings in the in-memory cache
+    unique_embeddings = {text: embedding_cache[key] for text, key in cache_keys.items() if key in embedding_cache}
+    # Look up the remaining embeddings in the persistent cache
+    cached_embeddings = get_cached_embeddings([key for text, key in cache_keys.items() if text not in unique_embeddings])
+    for text, key in cache_keys.items():
+        if key in cached_embeddings:
+            unique_embeddings[text] = embedding_cache[key] = cached_embeddings[key]
+    logger.debug("Embeddings found in cache for %d of %d unique texts", len(unique_embeddings), len(positions))
+    # Submit each batch of uncached texts to the shared thread pool
+    uncached_texts = [text for text in positions if text not in unique_embeddings]
+    futures = [executor.submit(embed_batch, uncached_texts[i:i + EMBEDDING_BATCH_SIZE])
+               for i in range(0, len(uncached_texts), EMBEDDING_BATCH_SIZE)]
+    # Gather the embeddings in batch order
+    generated_embeddings = []
+    for future in futures:
+        generated_embeddings.extend(future.result())
+    # Store the generated embeddings in the in-memory and persistent caches
+    new_embeddings = {}
+    for text, embedding in zip(uncached_texts, generated_embeddings):
+        key = cache_keys[text]
+        unique_embeddings[text] = embedding_cache[key] = new_embeddings[key] = embedding
+    cache_embeddings(new_embeddings)
+    # Fan out the embedding of each unique text to all of its positions
+    embeddings = [None] * len(texts)
+    for text, embedding in unique_embeddings.items():
+        for i in positions[text]:
+            embeddings[i] = embedding
+    return embeddings
+
+def prepare_data_for_upsert(url: str, data_chunks: list[str], stop: threading.Event = None) -> Iterator[dict]:
     """
     This method prepares the data chunks for upsert operation in the vector store.
-    Creates a multi-dimensional array with each element presenting a record holding values for three columns: `id`, `values`, `metadata`.
+    Yields a record for each chunk holding values for three fields: `id`, `values`, `metadata`.
 
     :param str url: The URL of the page
     :param list[str] data_chunks: The document chunks
-    :return: The prepared data for upsert operation
-    :rtype: list
+    :param threading.Event stop: Event signalling to stop early (no further embeddings are generated once set)
+    :return: The prepared records for upsert operation
+    :rtype: Iterator[dict]
     """
-    print(f"Preparing data for upsert operation for {url}")
-    # Prepare data for upsert operation
-    data_to_upsert = []
-    # Embeddings generation and addition to the list
-    # Ideally, when using the 'models/text-embedding-004' model, embeddings of dimension 768 are generated for each chunk
-    embeddings = [get_embeddings(text) for text in data_chunks]
-    print(f"Embeddings generated for {url}")
-    # Add metadata to the DataFrame
+    logger.debug("Preparing data for upsert operation for %s", url)
     # We add the URL of the page as metadata to each document chunk
-    # This enables us to perform filtering based on the URL later on (e.g., to delete existing chunks for a URL)
-    metadata = [{'url': url} for _ in range(len(data_chunks))]
-    print(f"Metadata added for {url}")
-    # Add id field for each chunk (we add at random as we don't need the id field for retrieval or data manipulation)
-    # ID is UUID generated for each chunk
-    ids = [str(uuid.uuid4()) for _ in range(len(data_chunks))]
-    print(f"IDs generated for {url}")
-    # Prepare data for upsert operation
+    # This enables us to perform filtering based on the URL later on
+    # Metadata is identical for every chunk (and not modified downstream), so a single dict is shared by all records
+    metadata = {"url": url}
+    # Chunks are embedded `EMBEDDING_CHUNK_SIZE` at a time, so records are yielded as soon as their embeddings are ready
+    for i in range(0, len(data_chunks), EMBEDDING_CHUNK_SIZE):
+        if stop is not None and stop.is_set():
+            logger.debug("Stopped preparing data for upsert operation for %s", url)
+            return
+        chunks = data_chunks[i:i + EMBEDDING_CHUNK_SIZE]
+        # Embeddings generation
+        # Ideally, when using the 'models/text-embedding-004' model, embeddings of dimension 768 are generated for each chunk
+        embeddings = get_embeddings_batch(chunks)
+        logger.debug("Embeddings generated for %d of %d chunks for %s", i + len(chunks), len(data_chunks), url)
+        for chunk, embedding in zip(chunks, embeddings):
+            yield {
+                # ID is derived from the content of each chunk, so unchanged chunks keep their ID across re-crawls
+                "id": get_chunk_id(chunk),
+                "values": embedding,
+                "metadata": metadata
+            }
+    logger.debug("Data prepared for upsert operation for %s", url)
+
+def produce_upsert_batches(url: str, data_chunks: list[str], batches: Queue, stop: threading.Event):
+    """
+    This method prepares the data chunks for upsert operation and puts them on the given queue
+    in batches of `UPSERT_BATCH_SIZE` records. Puts `None` on the queue once all batches are produced,
+    or the raised exception if preparing the data fails.
+
+    :param str url: The URL of the page
+    :param list[str] data_chunks: The document chunks
+    :param Queue batches: The queue to put the batches of records on
+    :param threading.Event stop: Event signalling the producer to stop early
+    """
     try:
-        for i in range(len(data_chunks)):
-            data_to_upsert.append([ids[i], embeddings[i], metadata[i]])
-            len(data_to_upsert)
+        records = prepare_data_for_upsert(url=url, data_chunks=data_chunks, stop=stop)
+        while not stop.is_set() and (batch := list(islice(records, UPSERT_BATCH_SIZE))):
+            batches.put(batch)
+        batches.put(None)
     except Exception as e:
-        print(f"An error occurred while preparing data for upsert operation: {e}")
-    print(f"Data prepared for upsert operation for {url}")
-    return data_to_upsert
+        batches.put(e)
 
 def store_chunks_in_vector_store(url:str, data_chunks: list[str]):
     """
@@ -109,20 +407,36 @@ def store_chunks_in_vector_store(url:str, data_chunks: list[str]):
     :param str url: The URL of the page (to add to the metadata)
     :param list[str] data_chunks: The document chunks
     """
-    print(f"Storing chunks in vector store for {url}")
-    try:
-        # Prepare data for upsert operation
-        data_to_upsert = prepare_data_for_upsert(url=url, data_chunks=data_chunks)
-    except Exception as e:
-        raise Exception(f"An error occurred while preparing data for upsert operation: {e}")
+    logger.debug("Storing chunks in vector store for %s", url)
     # Get Singleton vector store index instance
     vector_store_idx = get_vector_store_index()
+    # Prepare data for upsert operation in a separate thread, so embeddings keep being generated while upserting
+    batches = Queue(maxsize=UPSERT_QUEUE_SIZE)
+    stop = threading.Event()
+    producer = threading.Thread(target=produce_upsert_batches, args=(url, data_chunks, batches, stop), daemon=True)
+    producer.start()
     # Store the document chunks in the vector store
-    vector_store_idx.upsert(
-        namespace=url,
-        vectors=[{"id": record[0], "values": record[1], "metadata": record[2]} for record in data_to_upsert]
-    )
-    print(f"Data stored in vector store for {url}")
+    # Vectors are sent in batches of `UPSERT_BATCH_SIZE` as soon as they are prepared, and the batches are sent concurrently
+    futures = []
+    try:
+        while (batch := batches.get()) is not None:
+            if isinstance(batch, Exception):
+                raise Exception(f"An error occurred while preparing data for upsert operation: {batch}")
+            futures.append(vector_store_idx.upsert(namespace=url, vectors=batch, async_req=True))
+    except Exception:
+        # Stop the producer, and keep unblocking it (if it is waiting on a full queue) until it exits,
+        # so it doesn't resume in a later invocation of a warm Lambda
+        stop.set()
+        while producer.is_alive():
+            while not batches.empty():
+                batches.get_nowait()
+            producer.join(timeout=0.1)
+        raise
+    producer.join()
+    # Wait for all batches to be stored
+    for future in futures:
+        future.result()
+    logger.info("Data stored in vector store for %s", url)
 
 def get_data_chunks(url: str) -> list[str]:
     """
@@ -132,25 +446,23 @@ def get_data_chunks(url: str) -> list[str]:
     :return: The document chunks
     :rtype: list
     """
-    print(f"Invoking LEDAA Text Splitter Lambda for {url}")
-    lambda_client = boto3.client('lambda')
+    logger.debug("Invoking LEDAA Text Splitter Lambda for %s", url)
     # Invoke the LEDAA Text Splitter Lambda synchronously
     try:
-        response = lambda_client.invoke(
+        response = get_lambda_client().invoke(
             FunctionName='ledaa_text_splitter',
             InvocationType='RequestResponse',
-            Payload='{"url": "' + url + '"}'
+            Payload=orjson.dumps({"url": url})
         )
         # Check invocation status
         if response['StatusCode'] != 200:
             # Log the error
-            print(response)
+            logger.error("%s", response)
             raise Exception(f"Error: Failed to invoke LEDAA Text Splitter Lambda for {url}")
         else:
-            print(f"LEDAA Text Splitter Lambda invoked successfully for {url}")
+            logger.debug("LEDAA Text Splitter Lambda invoked successfully for %s", url)
             # Parse the response
-            response_payload = response['Payload'].read().decode('utf-8')
-            return json.loads(response_payload)
+            return orjson.loads(response['Payload'].read())
     except Exception as e:
         raise Exception(f"An error occurred while invoking LEDAA Text Splitter Lambda: {e}")
     
@@ -162,18 +474,33 @@ def main(url: str):
             'body': 'URL is required'
         }
     try:
-        # Delete existing chunks in vector store belonging to the URL
-        delete_existing_chunks(url=url)
-        # Get data chunks by processing data through LEDAA Text Splitter
-        data_chunks = get_data_chunks(url=url)
+        # Get data chunks by processing data through LEDAA Text Splitter (in the background)
+        data_chunks_future = executor.submit(get_data_chunks, url=url)
+        try:
+            # Meanwhile, list existing chunks in vector store belonging to the URL
+            existing_ids = get_existing_chunk_ids(url=url)
+        finally:
+            # Wait for the LEDAA Text Splitter, so it doesn't outlive the invocation (even if listing fails)
+            wait([data_chunks_future])
+        data_chunks = data_chunks_future.result()
         if not data_chunks:
             return {
                 'statusCode': 500,
                 'body': 'Failed to preprocess data'
             }
-        print(f"Data chunks retrieved for {url}")
-        # Store the document chunks in the vector store
-        store_chunks_in_vector_store(url=url, data_chunks=data_chunks)
+        logger.info("Data chunks retrieved for %s", url)
+        # Map each chunk ID to its chunk (identical chunks share the same ID)
+        chunks_by_id = {get_chunk_id(chunk): chunk for chunk in data_chunks}
+        # Store only the document chunks not already in the vector store
+        new_chunks = [chunk for chunk_id, chunk in chunks_by_id.items() if chunk_id not in existing_ids]
+        if new_chunks:
+            store_chunks_in_vector_store(url=url, data_chunks=new_chunks)
+        else:
+            logger.info("No new chunks to store for %s", url)
+        # Delete the existing chunks no longer present (only once the new chunks are stored)
+        stale_ids = existing_ids - chunks_by_id.keys()
+        if stale_ids:
+            delete_existing_chunks(url=url, ids=stale_ids)
         # if successful, return success message
         return {    
             'statusCode': 200,
@@ -187,7 +514,7 @@ def main(url: str):
 
 # Lambda handler method (will be invoked by AWS Lambda)
 def lambda_handler(event, context):
-    print("LEDAA Load Data Lambda invoked")
+    logger.info("LEDAA Load Data Lambda invoked")
     # Validate URL 
     if "url" not in event:
         return {
@@ -199,4 +526,6 @@ def lambda_handler(event, context):
 
 # Local testing
 if __name__ == "__main__":
+    # Output logs to the console
+    logging.basicConfig()
     print(lambda_handler({"url": ""}, None))
\ No newline at end of file
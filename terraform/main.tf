@@ -15,6 +15,22 @@ provider "aws" {
   secret_key = var.AWS_SECRET_KEY
 }
 
+resource "aws_dynamodb_table" "embedding_cache" {
+  name         = "ledaa_embedding_cache"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "cache_key"
+
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
+
 resource "aws_iam_role" "lambda_role" {
   name = "ledaa_load_data_lambda_role"
 
@@ -54,6 +70,14 @@ resource "aws_iam_role_policy" "lambda_policy" {
         Action   = "lambda:InvokeFunction"
         Effect   = "Allow"
         Resource = var.LEDAA_TEXT_SPLITTER_ARN
+      },
+      {
+        Action = [
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.embedding_cache.arn
       }
     ]
   })
@@ -84,6 +108,7 @@ resource "aws_lambda_function" "ledaa_load_data" {
       GOOGLE_API_KEY      = var.GOOGLE_API_KEY
       PINECONE_API_KEY    = var.PINECONE_API_KEY
       PINECONE_INDEX_HOST = var.PINECONE_INDEX_HOST
+      EMBED_CACHE_TABLE   = aws_dynamodb_table.embedding_cache.name
     }
   }
 }
\ No newline at end of file
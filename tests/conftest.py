@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+import core
+
+
+class FakeFuture:
+    def __init__(self, value=None):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+class FakeIndex:
+    """In-memory stand-in for the Pinecone gRPC index (single namespace)."""
+
+    def __init__(self):
+        self.vectors = {}
+        self.operations = []
+        self.list_error = None
+        self.upsert_error_at = None
+
+    def list(self, namespace):
+        if self.list_error is not None:
+            raise self.list_error
+        yield list(self.vectors)
+
+    def upsert(self, namespace, vectors, async_req):
+        self.operations.append(("upsert", [vector["id"] for vector in vectors]))
+        if self.upsert_error_at == len([op for op in self.operations if op[0] == "upsert"]):
+            raise RuntimeError("upsert failed")
+        for vector in vectors:
+            self.vectors[vector["id"]] = vector
+        return FakeFuture()
+
+    def delete(self, ids, namespace, async_req):
+        self.operations.append(("delete", list(ids)))
+        for id_ in ids:
+            self.vectors.pop(id_, None)
+        return FakeFuture()
+
+
+@pytest.fixture
+def fake_index(monkeypatch):
+    index = FakeIndex()
+    monkeypatch.setattr(core, "get_vector_store_index", lambda: index)
+    return index
+
+
+@pytest.fixture
+def embedded_texts(monkeypatch):
+    """Replaces the embedding model, recording every text sent to it."""
+    texts = []
+    lock = threading.Lock()
+
+    def embed_content(model, content, task_type):
+        with lock:
+            texts.extend(content)
+        return {"embedding": [[float(len(text)), 1.0] for text in content]}
+
+    monkeypatch.setattr(core.genai, "embed_content", embed_content)
+    # Disable the embedding caches
+    monkeypatch.delenv("EMBED_CACHE_TABLE", raising=False)
+    monkeypatch.setattr(core, "embedding_cache_table", None)
+    core.embedding_cache.clear()
+    return texts
+
+
+@pytest.fixture
+def data_chunks(monkeypatch):
+    """Replaces the LEDAA Text Splitter, returning the chunks appended to the returned list."""
+    chunks = []
+    monkeypatch.setattr(core, "get_data_chunks", lambda url: list(chunks))
+    return chunks
@@ -0,0 +1,27 @@
+import boto3
+import numpy as np
+from moto import mock_aws
+
+import core
+
+
+@mock_aws
+def test_embedding_cache_round_trip(monkeypatch):
+    # Create the embedding cache table (matching terraform/main.tf)
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "ca-central-1")
+    monkeypatch.setenv("EMBED_CACHE_TABLE", "ledaa_embedding_cache")
+    boto3.client("dynamodb").create_table(
+        TableName="ledaa_embedding_cache",
+        KeySchema=[{"AttributeName": "cache_key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "cache_key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    monkeypatch.setattr(core, "embedding_cache_table", None)
+
+    embedding = np.arange(768, dtype=np.float32)
+    core.cache_embeddings({"k1": embedding})
+
+    cached_embeddings = core.get_cached_embeddings(["k1", "k2"])
+    assert list(cached_embeddings) == ["k1"]
+    assert cached_embeddings["k1"].dtype == np.float32
+    np.testing.assert_array_equal(cached_embeddings["k1"], embedding)
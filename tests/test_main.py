@@ -0,0 +1,50 @@
+import core
+
+
+def test_main_fails_when_listing_existing_chunks_fails(fake_index, embedded_texts, data_chunks):
+    data_chunks.extend(["a", "b"])
+    fake_index.list_error = RuntimeError("list not supported")
+
+    response = core.main("https://example.com")
+
+    assert response["statusCode"] == 500
+    assert "list not supported" in response["body"]
+    assert fake_index.operations == []
+    assert embedded_texts == []
+
+
+def test_main_stores_only_new_chunks_and_deletes_only_stale_chunks(fake_index, embedded_texts, data_chunks):
+    url = "https://example.com"
+    # Initial crawl
+    data_chunks.extend(["unchanged", "removed"])
+    assert core.main(url)["statusCode"] == 200
+    fake_index.operations.clear()
+    embedded_texts.clear()
+    core.embedding_cache.clear()
+
+    # Re-crawl: one chunk unchanged, one removed, one new (appearing twice)
+    data_chunks[:] = ["unchanged", "new", "new"]
+    response = core.main(url)
+
+    assert response["statusCode"] == 200
+    # Unchanged chunks are neither embedded nor upserted, duplicates are embedded and upserted once
+    assert embedded_texts == ["new"]
+    assert fake_index.operations == [
+        ("upsert", [core.get_chunk_id("new")]),
+        # Only stale chunks are deleted, after the new chunks are stored
+        ("delete", [core.get_chunk_id("removed")]),
+    ]
+    assert set(fake_index.vectors) == {core.get_chunk_id("unchanged"), core.get_chunk_id("new")}
+
+
+def test_main_does_not_write_when_chunks_are_unchanged(fake_index, embedded_texts, data_chunks):
+    url = "https://example.com"
+    data_chunks.extend(["a", "b"])
+    assert core.main(url)["statusCode"] == 200
+    fake_index.operations.clear()
+    embedded_texts.clear()
+    core.embedding_cache.clear()
+
+    assert core.main(url)["statusCode"] == 200
+    assert embedded_texts == []
+    assert fake_index.operations == []
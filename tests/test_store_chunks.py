@@ -0,0 +1,42 @@
+import threading
+
+import core
+
+
+def producer_threads():
+    return [thread for thread in threading.enumerate() if "produce_upsert_batches" in thread.name]
+
+
+def test_upsert_failure_stops_the_producer(fake_index, embedded_texts, data_chunks):
+    # Multiple embedding rounds, failing on the second upsert batch of the first round
+    data_chunks.extend(f"chunk {i}" for i in range(3 * core.EMBEDDING_CHUNK_SIZE))
+    fake_index.upsert_error_at = 2
+
+    response = core.main("https://example.com")
+
+    assert response["statusCode"] == 500
+    assert "upsert failed" in response["body"]
+    assert producer_threads() == []
+    # No embedding round is started after the failure
+    assert len(embedded_texts) == core.EMBEDDING_CHUNK_SIZE
+
+
+def test_producer_failure_is_raised(fake_index, embedded_texts, data_chunks, monkeypatch):
+    # The embedding model fails in the second embedding round
+    data_chunks.extend(f"chunk {i}" for i in range(core.EMBEDDING_CHUNK_SIZE))
+    data_chunks.append("invalid chunk")
+    embed_content = core.genai.embed_content
+
+    def failing_embed_content(model, content, task_type):
+        if "invalid chunk" in content:
+            raise ValueError("invalid content")
+        return embed_content(model=model, content=content, task_type=task_type)
+
+    monkeypatch.setattr(core.genai, "embed_content", failing_embed_content)
+
+    response = core.main("https://example.com")
+
+    assert response["statusCode"] == 500
+    assert "An error occurred while preparing data for upsert operation: invalid content" in response["body"]
+    assert producer_threads() == []
+    assert len(embedded_texts) == core.EMBEDDING_CHUNK_SIZE